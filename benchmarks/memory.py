@@ -0,0 +1,97 @@
+"""
+measures the memory used per cached chunk by the default and the compact NBT tree
+
+usage: python benchmarks/memory.py [world path] [chunk count]
+without a world, a synthetic 1.16 style chunk is parsed repeatedly
+"""
+import gc
+import sys
+import tracemalloc
+import random
+import zlib
+from os.path import dirname, abspath
+
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+import worldtools
+from worldtools.nbt import NBTParser
+from worldtools.nbt.types import Byte, Int, Long, String, List, Compound, ByteArray, IntArray, LongArray
+from worldtools.world.chunk import BlockStates
+import numpy
+
+
+BLOCKS = ["minecraft:air", "minecraft:stone", "minecraft:dirt", "minecraft:grass_block", "minecraft:granite",
+          "minecraft:diorite", "minecraft:andesite", "minecraft:gravel", "minecraft:coal_ore", "minecraft:iron_ore",
+          "minecraft:water", "minecraft:bedrock"]
+
+
+def synthetic_chunk(x: int, z: int) -> bytes:
+    sections = List([])
+    for y in range(16):
+        palette = List([Compound({"Name": String(name)}) for name in BLOCKS])
+        palette.append(Compound({"Name": String("minecraft:oak_log"), "Properties": Compound({"axis": String("y")})}))
+        indices = numpy.random.randint(0, len(palette), 4096)
+        sections.append(Compound({
+            "Y": Byte(y),
+            "Palette": palette,
+            "BlockStates": LongArray([Long(v) for v in BlockStates.palette_indices_to_longarray(indices, len(palette), True)]),
+            "BlockLight": ByteArray(bytearray(random.getrandbits(8) for _ in range(2048))),
+            "SkyLight": ByteArray(bytearray(random.getrandbits(8) for _ in range(2048))),
+        }))
+    level = Compound({
+        "xPos": Int(x),
+        "zPos": Int(z),
+        "Status": String("full"),
+        "Sections": sections,
+        "Biomes": IntArray([Int(random.randint(0, 50)) for _ in range(1024)]),
+        "Heightmaps": Compound({name: LongArray([Long(random.getrandbits(62)) for _ in range(37)])
+                                for name in ("MOTION_BLOCKING", "OCEAN_FLOOR", "WORLD_SURFACE")}),
+        "TileEntities": List([]),
+    })
+    return NBTParser.pack(Compound({"DataVersion": Int(2586), "Level": level}), False)
+
+
+def load_chunks(world: str, count: int):
+    w = worldtools.World(world)
+    out = []
+    for region_x in range(-8, 8):
+        for region_z in range(-8, 8):
+            if w.get_region_file((region_x, region_z)) is None:
+                continue
+            region = w.get_region((region_x * 32, region_z * 32))
+            for i in range(1024):
+                chunk = (region_x * 32 + i % 32, region_z * 32 + i // 32)
+                loc = region.get_chunk_location(chunk)
+                if loc is None:
+                    continue
+                raw = region.get_raw_chunk(chunk)
+                length = int.from_bytes(raw[:4], "big")
+                out.append(zlib.decompress(raw[5:4 + length]))
+                if len(out) >= count:
+                    return out
+    return out
+
+
+def measure(chunks, compact: bool) -> float:
+    gc.collect()
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    cache = [NBTParser.parse(data, False, compact=compact) for data in chunks]
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    del cache
+    return used / len(chunks)
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    if len(sys.argv) > 1:
+        data = load_chunks(sys.argv[1], count)
+    else:
+        data = [synthetic_chunk(i, 0) for i in range(count)]
+    default = measure(data, False)
+    compact = measure(data, True)
+    print(f"{len(data)} chunks")
+    print(f"default: {default / 1024:.1f} KiB per chunk")
+    print(f"compact: {compact / 1024:.1f} KiB per chunk ({default / compact:.1f}x smaller)")
@@ -0,0 +1,63 @@
+import os
+import struct
+import zlib
+import sys
+
+import numpy
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from worldtools.nbt import NBTParser
+from worldtools.nbt.types import Byte, Int, String, List, Compound, LongArray
+from worldtools.world.chunk import BlockStates
+
+BLOCKS = ["minecraft:air", "minecraft:stone", "minecraft:dirt"]
+
+
+def make_chunk(x: int, z: int, data_version: int, seed: int = 0) -> Compound:
+    random = numpy.random.default_rng(seed)
+    padded = data_version >= BlockStates.PADDED_DATA_VERSION
+    sections = List([])
+    for y in range(2):
+        indices = random.integers(0, len(BLOCKS), 4096)
+        sections.append(Compound({
+            "Y": Byte(y),
+            "Palette": List([Compound({"Name": String(name)}) for name in BLOCKS]),
+            "BlockStates": LongArray(BlockStates.palette_indices_to_longarray(indices, len(BLOCKS), padded)),
+        }))
+    level = Compound({
+        "xPos": Int(x),
+        "zPos": Int(z),
+        "Sections": sections,
+        "isLightOn": Byte(1),
+        "Heightmaps": Compound({"WORLD_SURFACE": LongArray([0] * 37)}),
+    })
+    return Compound({"DataVersion": Int(data_version), "Level": level})
+
+
+def write_region(path: str, chunks: dict) -> None:
+    """
+    writes a region file with every chunk in its own sectors
+    :param chunks: mapping of local chunk coordinates to the root compound
+    """
+    locations = bytearray(4096)
+    body = b""
+    sector = 2
+    for (x, z), root in chunks.items():
+        data = zlib.compress(NBTParser.pack(root, False))
+        data = struct.pack(">IB", len(data) + 1, 2) + data
+        count = (len(data) + 4095) // 4096
+        locations[4 * (x + z * 32):4 * (x + z * 32) + 4] = sector.to_bytes(3, "big") + bytes([count])
+        body += data + bytes(count * 4096 - len(data))
+        sector += count
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(bytes(locations) + bytes(4096) + body)
+
+
+@pytest.fixture(params=[2230, 2586], ids=["tight", "padded"])
+def world_path(tmp_path, request):
+    chunks = {(x, z): make_chunk(x, z, request.param, x * 4 + z) for x in range(2) for z in range(2)}
+    write_region(os.path.join(str(tmp_path), "region", "r.0.0.mca"), chunks)
+    return str(tmp_path)
@@ -0,0 +1,63 @@
+import os
+
+import pytest
+
+from worldtools import World, Region, Light, Biomes
+from worldtools.nbt import NBTParser
+from worldtools.nbt.types import IntArray, ByteArray
+from conftest import make_chunk, write_region
+
+
+@pytest.fixture
+def lit_world(tmp_path):
+    chunks = {}
+    for x in range(2):
+        root = make_chunk(x, 0, 2586, x)
+        root["Level"]["Biomes"] = IntArray(list(range(1024)))
+        for section in root["Level"]["Sections"]:
+            # low nibble is the even block, high nibble the odd block
+            section[Light.SKY] = ByteArray(bytearray([(section["Y"] + 2) << 4 | (section["Y"] + 1)] * 2048))
+        chunks[(x, 0)] = root
+    write_region(os.path.join(str(tmp_path), "region", "r.0.0.mca"), chunks)
+    return str(tmp_path)
+
+
+def test_nibbles_to_volume():
+    volume = Light.nibbles_to_volume([0x21] * 2048)
+    assert volume.shape == (16, 16, 16)
+    assert volume[0, 0, 0] == 1 and volume[0, 0, 1] == 2
+
+
+def test_biomes():
+    assert Biomes.to_array(list(range(256))).shape == (16, 16)
+    array = Biomes.to_array(list(range(1024)))
+    assert array[2, 1, 3] == 2 * 16 + 1 * 4 + 3
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_chunk_accessors(lit_world, compact):
+    chunk = World(lit_world, compact_nbt=compact).get_chunk((1, 0))
+    assert chunk.get_biomes().get_layer(9)[5, 6] == 2 * 16 + 1 * 4 + 1
+    light = chunk.get_light(Light.SKY)
+    assert light.shape == (256, 16, 16)
+    assert light[16, 0, 0] == 2 and light[16, 0, 1] == 3 and light[0, 0, 1] == 2 and light[40, 0, 0] == 15
+
+
+def test_rasters(lit_world):
+    region = World(lit_world).get_region((0, 0))
+    biomes = region.get_biome_raster(9)
+    assert biomes[5, 16 + 6] == 2 * 16 + 1 * 4 + 1
+    assert biomes[100, 100] == -1
+    light = region.get_light_raster(17, Light.SKY)
+    assert light[0, 16] == 2 and light[0, 17] == 3 and light[100, 100] == 15
+
+    chunks = list(region.get_chunks(Region.LIGHT_KEYS))
+    assert set(chunks[0].data["Level"].keys()) == {"Sections"}
+    assert set(chunks[0].data["Level"]["Sections"][0].keys()) == {"Y", Light.SKY}
+    assert (region.get_light_raster(17, Light.SKY, chunks) == light).all()
+
+
+def test_nested_keys():
+    data = NBTParser.pack(make_chunk(0, 0, 2586), False)
+    parsed = NBTParser.parse(data, False, keys={"Level": {"Sections": {"Y": None}, "xPos": None}, "DataVersion": None})
+    assert parsed == {"DataVersion": 2586, "Level": {"xPos": 0, "Sections": [{"Y": 0}, {"Y": 1}]}}
@@ -0,0 +1,41 @@
+import numpy
+import pytest
+
+from worldtools.world.chunk import BlockStates
+
+
+@pytest.mark.parametrize("padded", [False, True])
+@pytest.mark.parametrize("bits", range(4, 13))
+def test_roundtrip(bits, padded):
+    palette_size = 2 ** bits
+    indices = numpy.random.default_rng(bits).integers(0, palette_size, 4096).astype(numpy.uint16)
+    longs = BlockStates.palette_indices_to_longarray(indices, palette_size, padded)
+    if padded:
+        assert len(longs) == -(-4096 // (64 // bits))
+        decoded = BlockStates.padded_longarray_to_palette_indices(longs, palette_size)
+    else:
+        assert len(longs) == 64 * bits
+        decoded = BlockStates.longarray_to_palette_indices(longs)
+    assert (decoded == indices).all()
+
+
+def test_tight_11_bits():
+    # every value has a distinct bit pattern, so wrong shifts can't go unnoticed
+    indices = numpy.arange(4096, dtype=numpy.uint16) % 2048
+    longs = BlockStates.palette_indices_to_longarray(indices, 2048)
+    assert (BlockStates.longarray_to_palette_indices(longs) == indices).all()
+
+
+def test_padded_layout():
+    # 5 bits: 12 values per long, the upper 4 bits are padding
+    indices = numpy.full((4096,), 31, dtype=numpy.uint16)
+    longs = BlockStates.palette_indices_to_longarray(indices, 20, True)
+    assert len(longs) == 342
+    assert longs[0] == (1 << 60) - 1
+
+
+def test_invalid_length():
+    with pytest.raises(ValueError):
+        BlockStates.longarray_to_palette_indices([0] * 342)
+    with pytest.raises(ValueError):
+        BlockStates.padded_longarray_to_palette_indices([0] * 320, 20)
@@ -0,0 +1,60 @@
+import copy
+import json
+import pickle
+
+import pytest
+
+from worldtools.nbt import NBTParser, CompactCompound
+from worldtools.nbt.compact import FrozenCompound
+from worldtools.nbt.types import IntArray
+from conftest import make_chunk
+
+
+@pytest.fixture
+def chunk_bytes():
+    chunk = make_chunk(0, 0, 2586)
+    chunk["Level"]["Biomes"] = IntArray([1] * 1024)
+    return NBTParser.pack(chunk, False)
+
+
+def test_roundtrip(chunk_bytes):
+    compact = NBTParser.parse(chunk_bytes, False, compact=True)
+    assert isinstance(compact, CompactCompound)
+    assert NBTParser.pack(compact, False) == chunk_bytes
+
+
+def test_shared_palette(chunk_bytes):
+    compact = NBTParser.parse(chunk_bytes, False, compact=True)
+    first, second = (section["Palette"] for section in compact["Level"]["Sections"])
+    assert first[1] is second[1]
+    assert isinstance(first[1], FrozenCompound)
+    with pytest.raises(TypeError):
+        first[1]["Name"] = "minecraft:gold_block"
+
+
+def test_json(chunk_bytes):
+    compact = NBTParser.parse(chunk_bytes, False, compact=True)
+    assert json.loads(compact.json())["Level"]["Biomes"] == [1] * 1024
+
+
+@pytest.mark.parametrize("duplicate", [copy.copy, copy.deepcopy, lambda c: pickle.loads(pickle.dumps(c))])
+def test_copy(chunk_bytes, duplicate):
+    compact = NBTParser.parse(chunk_bytes, False, compact=True)
+    section = duplicate(compact["Level"]["Sections"][0])
+    assert section == compact["Level"]["Sections"][0]
+    section["Y"] = 5
+    assert section.get_type_id("Y") == 1
+    assert NBTParser.pack(duplicate(compact), False) == chunk_bytes
+
+
+def test_keys_and_compact(chunk_bytes):
+    with pytest.raises(ValueError):
+        NBTParser.parse(chunk_bytes, False, keys=["Level"], compact=True)
+
+
+def test_plain_values():
+    with pytest.raises(TypeError):
+        CompactCompound({"a": 1})
+    compound = CompactCompound({"a": 1}, {"a": 3})
+    assert compound.get_type_id("a") == 3
+    assert NBTParser.parse(NBTParser.pack(compound, False), False, compact=True) == compound
@@ -0,0 +1,73 @@
+import gzip
+import os
+import stat
+
+import pytest
+
+from worldtools import World, PlayerIndex, PlayerRestorer
+from worldtools.exceptions import PlayerRestoreException, NBTParseException, PlayerNotFoundException
+from worldtools.nbt import NBTParser
+from worldtools.nbt.types import Byte, Int, Double, Float, String, List, Compound
+
+UUIDS = [f"00000000-0000-0000-0000-00000000000{i}" for i in range(4)]
+
+
+def player(item: str, x: float) -> Compound:
+    return Compound({
+        "Inventory": List([Compound({"id": String(item), "Count": Byte(1), "Slot": Byte(0)})]),
+        "EnderItems": List([]),
+        "Pos": List([Double(x), Double(64), Double(0)]),
+        "Rotation": List([Float(0), Float(0)]),
+        "Dimension": String("minecraft:overworld"),
+        "XpLevel": Int(int(x)),
+    })
+
+
+@pytest.fixture
+def worlds(tmp_path):
+    paths = []
+    for name, item in (("target", "minecraft:dirt"), ("backup", "minecraft:diamond")):
+        path = os.path.join(str(tmp_path), name)
+        os.makedirs(os.path.join(path, "playerdata"))
+        for i, uuid in enumerate(UUIDS[:3]):
+            file = os.path.join(path, "playerdata", f"{uuid}.dat")
+            with open(file, "wb") as f:
+                f.write(NBTParser.pack(player(item, i if name == "target" else i + 10)))
+            os.chmod(file, 0o644)
+        paths.append(path)
+    return paths
+
+
+def test_index(worlds):
+    playerdata = os.path.join(worlds[0], "playerdata")
+    with open(os.path.join(playerdata, "truncated.dat"), "wb") as f:
+        f.write(gzip.compress(b"\x0a\x00\x00"))
+    with open(os.path.join(playerdata, "unknown.dat"), "wb") as f:
+        f.write(gzip.compress(b"\x0a\x00\x00\x63\x00\x01a\x00"))
+    index = PlayerIndex(World(worlds[0]))
+    assert len(index) == 3
+    assert index[UUIDS[2]].position == (2, 64, 0)
+    assert index[UUIDS[2]].dimension == "minecraft:overworld"
+    assert set(index.errors) == {"truncated", "unknown"}
+    assert all(isinstance(e, NBTParseException) for e in index.errors.values())
+
+
+def test_restore(worlds):
+    target, backup = worlds
+    restorer = PlayerRestorer(target, backup)
+    restorer.add_player(UUIDS[0], PlayerRestorer.INVENTORY)
+    restorer.add_player(UUIDS[1])
+    restorer.add_player(UUIDS[3])
+    with pytest.raises(PlayerRestoreException) as e:
+        restorer.perform()
+    assert sorted(e.value.restored) == UUIDS[:2]
+    assert isinstance(e.value.errors[UUIDS[3]], PlayerNotFoundException)
+
+    world = World(target)
+    partial = NBTParser.parse(world.get_player_file(UUIDS[0]))
+    assert partial["Inventory"][0]["id"] == "minecraft:diamond"
+    assert partial["XpLevel"] == 0
+    assert NBTParser.parse(world.get_player_file(UUIDS[1]))["XpLevel"] == 11
+    assert NBTParser.parse(world.get_player_file(UUIDS[2]))["Inventory"][0]["id"] == "minecraft:dirt"
+    for uuid in UUIDS[:2]:
+        assert stat.S_IMODE(os.stat(world.get_player_file(uuid)).st_mode) == 0o644
@@ -0,0 +1,63 @@
+import pytest
+
+from worldtools import World, Region
+from worldtools.nbt import NBTParser
+from worldtools.nbt.types import List
+from worldtools.world.chunk import Chunk
+from conftest import make_chunk
+
+
+def test_set_chunks_grows_chunk(world_path):
+    world = World(world_path)
+    region = world.get_region((0, 0))
+    untouched = region.get_raw_chunk((1, 1))
+    big = make_chunk(0, 0, 2586)
+    # random block states don't compress well, so the chunk needs more than its old sector
+    big["Level"]["Padding"] = List([make_chunk(0, 0, 2586, i)["Level"]["Sections"] for i in range(8)])
+    data = Chunk.compress(NBTParser.pack(big, False), 2)
+    data = (len(data) + 1).to_bytes(4, "big") + b"\x02" + data
+    region.set_chunks({(0, 0): data})
+    region.flush()
+
+    reread = Region((0, 0), World(world_path))
+    assert reread.get_chunk_location((0, 0))[1] > 4096
+    assert reread.get_chunk((0, 0)).data == big
+    length = int.from_bytes(untouched[:4], "big") + 4
+    assert reread.get_raw_chunk((1, 1))[:length] == untouched[:length]
+    assert reread.get_chunk((1, 0)).data["Level"]["xPos"] == 1
+
+
+def test_edit_roundtrip(world_path):
+    world = World(world_path)
+    other = world.get_block((20, 5, 3))
+    with world.edit() as session:
+        session.set_block((1, 2, 3), "minecraft:gold_block")
+        session.fill(((0, 16, 0), (15, 31, 15)), "minecraft:air")
+        session.set_block((4, 40, 4), {"Name": "minecraft:oak_log", "Properties": {"axis": "x"}})
+
+    world = World(world_path)
+    assert world.get_block((1, 2, 3)) == {"Name": "minecraft:gold_block"}
+    assert world.get_block((7, 20, 7)) == {"Name": "minecraft:air"}
+    assert world.get_block((4, 40, 4)) == {"Name": "minecraft:oak_log", "Properties": {"axis": "x"}}
+    assert world.get_block((20, 5, 3)) == other
+    chunk = world.get_chunk((0, 0))
+    assert len(chunk.data["Level"]["Sections"][0]["BlockStates"]) == len(world.get_chunk((1, 0)).data["Level"]["Sections"][0]["BlockStates"])
+    assert chunk.data["Level"]["isLightOn"] == 0
+    assert chunk.data["Level"]["Heightmaps"] == {}
+
+
+def test_fill_skips_missing_chunks(world_path):
+    world = World(world_path)
+    with world.edit() as session:
+        session.fill(((0, 0, 0), (47, 15, 1100)), "minecraft:air")
+        with pytest.raises(FileNotFoundError):
+            session.set_block((0, 0, 1100), "minecraft:stone")
+    assert World(world_path).get_block((17, 3, 17)) == {"Name": "minecraft:air"}
+
+
+def test_create_section_outside_world(world_path):
+    with World(world_path).edit() as session:
+        with pytest.raises(ValueError):
+            session.set_block((0, -5, 0), "minecraft:stone")
+        with pytest.raises(ValueError):
+            session.fill(((0, 290, 0), (3, 300, 3)), "minecraft:stone")
@@ -1,3 +1,4 @@
 from .world import *
 from .nbt import *
-from .backup import *
\ No newline at end of file
+from .backup import *
+from .player import PlayerSummary, PlayerIndex, PlayerRestorer
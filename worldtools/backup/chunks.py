@@ -35,6 +35,5 @@ class ChunkRestorer:
         for region, chunks in self._sort_actions_by_regions().items():
             target_region = Region(region, self.target_world)
             backup_region = Region(region, self.backup_world)
-            for chunk in chunks:
-                target_region.set_chunk(chunk, backup_region.get_raw_chunk(chunk))
+            target_region.set_chunks({chunk: backup_region.get_raw_chunk(chunk) for chunk in chunks})
             target_region.flush()
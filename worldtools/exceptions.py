@@ -1,4 +1,4 @@
-from typing import Tuple
+from typing import Tuple, List, Dict
 
 
 class ChunkNotFoundException(Exception):
@@ -19,3 +19,40 @@ class SectionNotPresentException(Exception):
 class HeightmapNotFoundException(Exception):
     def __init__(self, type_: str, chunk: Tuple[int, int]):
         super(HeightmapNotFoundException, self).__init__(f"Heightmap of type {type_} is not present in Chunk {chunk}")
+
+
+class PlayerNotFoundException(Exception):
+    """
+    raised when there is no playerdata for a player in the current world
+    """
+    def __init__(self, msg, uuid: str):
+        super(PlayerNotFoundException, self).__init__(msg)
+        self.uuid: str = uuid
+
+    def __reduce__(self):
+        # needed to send the exception from worker processes
+        return PlayerNotFoundException, (str(self), self.uuid)
+
+
+class BiomesNotFoundException(Exception):
+    def __init__(self, chunk: Tuple[int, int]):
+        super(BiomesNotFoundException, self).__init__(f"Biomes are not present in Chunk {chunk}")
+        self.chunk: Tuple[int, int] = chunk
+
+
+class PlayerRestoreException(Exception):
+    """
+    raised when some players could not be restored
+    """
+    def __init__(self, restored: List[str], errors: Dict[str, Exception]):
+        super(PlayerRestoreException, self).__init__(
+            f"{len(errors)} players could not be restored: " + ", ".join(f"{uuid} ({error!r})" for uuid, error in errors.items()))
+        self.restored: List[str] = restored
+        self.errors: Dict[str, Exception] = errors
+
+
+class NBTParseException(Exception):
+    """
+    raised when binary data is no valid NBT
+    """
+    pass
@@ -1 +1,2 @@
 from .parse import NBTParser
+from .compact import CompactCompound, CompactList
@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+from typing import Dict, Tuple, Any, Optional, Iterable
+from struct import Struct, pack, unpack
+from array import array
+from io import BytesIO
+from sys import intern, byteorder
+from weakref import WeakValueDictionary
+from .types import NBTBase, Byte, String, List, Compound, End, read_bytes
+from ..exceptions import NBTParseException
+import json
+
+
+# tag id -> struct of the plain scalar values
+_SCALARS: Dict[int, Struct] = {
+    1: Struct(">b"),
+    2: Struct(">h"),
+    3: Struct(">i"),
+    4: Struct(">q"),
+    5: Struct(">f"),
+    6: Struct(">d"),
+}
+# tag id -> typecode of the array values
+_ARRAYS: Dict[int, str] = {
+    7: "b",
+    11: "i",
+    12: "q",
+}
+
+# shared type tables of compounds with the same layout, never mutated
+_TYPES: Dict[Tuple[Tuple[str, int], ...], Dict[str, int]] = {}
+# shared palette entries
+_PALETTE_ENTRIES: WeakValueDictionary = WeakValueDictionary()
+
+
+def _intern_types(types: Dict[str, int]) -> Dict[str, int]:
+    return _TYPES.setdefault(tuple(types.items()), types)
+
+
+def _unpack_str(data: BytesIO) -> str:
+    length = unpack(">H", read_bytes(data, 2))[0]
+    return read_bytes(data, length).decode("utf-8")
+
+
+def _unpack_value(type_id: int, data: BytesIO, shared: bool = False) -> Any:
+    if type_id in _SCALARS:
+        scalar = _SCALARS[type_id]
+        return scalar.unpack(read_bytes(data, scalar.size))[0]
+    if type_id == String.DATATYPE_ID:
+        return _unpack_str(data)
+    if type_id in _ARRAYS:
+        length = unpack(">i", read_bytes(data, 4))[0]
+        out = array(_ARRAYS[type_id])
+        out.frombytes(read_bytes(data, length * out.itemsize))
+        if byteorder == "little":
+            out.byteswap()
+        return out
+    if type_id == List.DATATYPE_ID:
+        return CompactList.unpack(data, shared)
+    if type_id == Compound.DATATYPE_ID:
+        compound = CompactCompound.unpack(data)
+        return FrozenCompound.share(compound) if shared else compound
+    raise NBTParseException(f"unknown NBT type {type_id}")
+
+
+def _pack_value(type_id: int, value: Any) -> bytes:
+    if isinstance(value, NBTBase):
+        return value.pack()
+    if isinstance(value, array):
+        out = array(value.typecode, value)
+        if byteorder == "little":
+            out.byteswap()
+        return pack(">i", len(out)) + out.tobytes()
+    return NBTBase.get_type(type_id)(value).pack()
+
+
+class CompactCompound(Compound):
+    """
+    Memory saving variant of Compound created by NBTParser#parse(compact=True)
+    Keys are interned, numbers and strings are stored as plain python values and arrays as array.array,
+    the tag types of the values are kept in a type table that is shared between compounds with the same layout.
+    Values that are NBT Components keep their own type, plain values can only be passed together with their types.
+    """
+    __slots__ = ("types",)
+
+    def __init__(self, items=(), types: Optional[Dict[str, int]] = None):
+        super(CompactCompound, self).__init__(items)
+        if types is None:
+            types = {}
+            for key, value in self.items():
+                if not isinstance(value, NBTBase):
+                    raise TypeError(f"type of {key!r} is unknown, pass the tag types of plain values as types")
+                types[key] = value.DATATYPE_ID
+        self.types: Dict[str, int] = _intern_types(types)
+
+    def __reduce__(self):
+        # the default reduction restores items through __setitem__, which FrozenCompound doesn't allow
+        return type(self), (dict(self), self.types)
+
+    @staticmethod
+    def unpack(data: BytesIO) -> CompactCompound:
+        out = {}
+        types = {}
+        while True:
+            type_id = Byte.unpack(data)
+            if type_id == 0:
+                break
+            # only keys are interned, interned strings are never freed on newer python versions
+            name = intern(_unpack_str(data))
+            out[name] = _unpack_value(type_id, data, name == "Palette")
+            types[name] = type_id
+        return CompactCompound(out, _intern_types(types))
+
+    def get_type_id(self, key: str) -> int:
+        """
+        :param key: the name of an entry
+        :return: the tag type of the entry
+        """
+        value = self[key]
+        if isinstance(value, NBTBase):
+            return value.DATATYPE_ID
+        return self.types[key]
+
+    def set(self, key: str, value: Any, type_id: int) -> None:
+        """
+        sets an entry to a plain value
+        :param key: the name of the entry
+        :param value: the plain value
+        :param type_id: the tag type of the value
+        """
+        key = intern(key)
+        if self.types.get(key) != type_id:
+            self.types = _intern_types({**self.types, key: type_id})
+        dict.__setitem__(self, key, value)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if isinstance(value, NBTBase):
+            self.set(key, value, value.DATATYPE_ID)
+        elif key in self.types:
+            self.set(key, value, self.types[key])
+        else:
+            raise TypeError(f"type of {key!r} is unknown, use CompactCompound#set for new plain values")
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, *args, **kwargs) -> None:
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def pack(self) -> bytes:
+        out = []
+        for name, item in self.items():
+            type_id = item.DATATYPE_ID if isinstance(item, NBTBase) else self.types[name]
+            out.append(pack(">b", type_id))
+            out.append(String(name).pack())
+            out.append(_pack_value(type_id, item))
+        out.append(End().pack())
+        return b"".join(out)
+
+    def json(self):
+        return json.dumps(self, indent=4, default=list)
+
+
+class FrozenCompound(CompactCompound):
+    """
+    Immutable CompactCompound, equal palette entries of all parsed chunks share one instance
+    """
+    __slots__ = ("__weakref__",)
+
+    @staticmethod
+    def _key(compound: dict) -> Optional[tuple]:
+        key = []
+        for name, value in compound.items():
+            if isinstance(value, dict):
+                value = FrozenCompound._key(value)
+                if value is None:
+                    return None
+            elif not isinstance(value, str):
+                return None
+            key.append((name, value))
+        return tuple(key)
+
+    @staticmethod
+    def share(compound: CompactCompound) -> CompactCompound:
+        """
+        gets the shared instance of a palette entry
+        :param compound: the parsed palette entry
+        :return: the shared FrozenCompound, or the passed compound if it contains other values than strings and compounds
+        """
+        key = FrozenCompound._key(compound)
+        if key is None:
+            return compound
+        shared = _PALETTE_ENTRIES.get(key)
+        if shared is None:
+            shared = FrozenCompound({name: FrozenCompound.share(value) if isinstance(value, CompactCompound) else value
+                                     for name, value in compound.items()}, compound.types)
+            _PALETTE_ENTRIES[key] = shared
+        return shared
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError("shared palette entries can't be modified")
+
+    set = __setitem__ = __delitem__ = setdefault = update = pop = popitem = clear = _immutable
+
+    def __hash__(self):
+        return hash(FrozenCompound._key(self))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+class CompactList(List):
+    """
+    Memory saving variant of List, see CompactCompound
+    """
+    __slots__ = ("element_type",)
+
+    def __init__(self, items: Iterable = (), element_type: int = End.DATATYPE_ID):
+        super(CompactList, self).__init__(items)
+        self.element_type: int = element_type
+
+    @staticmethod
+    def unpack(data: BytesIO, shared: bool = False) -> CompactList:
+        element_type = Byte.unpack(data)
+        length = unpack(">i", read_bytes(data, 4))[0]
+        if element_type == End.DATATYPE_ID:
+            return CompactList()
+        return CompactList([_unpack_value(element_type, data, shared) for _ in range(length)], element_type)
+
+    def pack(self) -> bytes:
+        if not self:
+            return pack(">bi", self.element_type, 0)
+        element_type = self[0].DATATYPE_ID if isinstance(self[0], NBTBase) else self.element_type
+        return pack(">bi", element_type, len(self)) + b"".join(_pack_value(element_type, item) for item in self)
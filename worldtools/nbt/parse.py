@@ -1,6 +1,8 @@
-from typing import Union
+from typing import Union, Optional, Iterable, Mapping
 from os.path import isfile
 from .types import *
+from .compact import CompactCompound
+from ..exceptions import NBTParseException
 from io import BytesIO
 import gzip
 
@@ -10,15 +12,19 @@ class NBTParser:
     static class for parsing minecraft NBT files
     """
     @staticmethod
-    def parse(data: Union[str, bytes, BytesIO], decompress=True):
+    def parse(data: Union[str, bytes, BytesIO], decompress=True, keys: Optional[Union[Iterable[str], Mapping]] = None, compact=False):
         """
         Parses the specified file or data to Minecraft NBT
         :param data: Path to a file or byte data
         :param decompress: whether to decompress the specified data
+        :param keys: if specified, only these entries of the root compound are parsed, see Compound#unpack_keys
+        :param compact: whether to parse to a memory saving CompactCompound tree, can't be used together with keys
         :return: root compound of given binary data
         """
+        if keys is not None and compact:
+            raise ValueError("keys can't be used together with compact")
         if isinstance(data, BytesIO):
-            return NBTParser._parse(data)
+            return NBTParser._parse(data, keys, compact)
         if isfile(data):
             with open(data, "rb") as f:
                 data = f.read()
@@ -26,9 +32,29 @@ class NBTParser:
             raise TypeError("data must be a file path or bytes")
         if decompress:
             data = gzip.decompress(data)
-        return NBTParser._parse(BytesIO(data))
+        return NBTParser._parse(BytesIO(data), keys, compact)
 
     @staticmethod
-    def _parse(data: BytesIO):
-        root_compound = Compound.unpack(data)
-        return root_compound[""]
+    def _parse(data: BytesIO, keys: Optional[Union[Iterable[str], Mapping]] = None, compact=False):
+        if Byte.unpack(data) != Compound.DATATYPE_ID:
+            raise NBTParseException("the root of NBT data has to be a Compound")
+        # the name of the root compound is not used
+        String.skip(data)
+        if keys is not None:
+            return Compound.unpack_keys(data, keys)
+        if compact:
+            return CompactCompound.unpack(data)
+        return Compound.unpack(data)
+
+    @staticmethod
+    def pack(data: Compound, compress=True) -> bytes:
+        """
+        Packs the specified root compound to Minecraft NBT
+        :param data: the root compound to pack
+        :param compress: whether to gzip the packed data
+        :return: the binary NBT data
+        """
+        packed = Byte(Compound.DATATYPE_ID).pack() + String("").pack() + data.pack()
+        if compress:
+            packed = gzip.compress(packed)
+        return packed
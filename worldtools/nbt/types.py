@@ -1,11 +1,31 @@
 from __future__ import annotations
 
-from typing import Optional, Type
-from struct import unpack
+from typing import Type, Iterable, Mapping, Union, Any, Dict
+from struct import pack, unpack
 from io import BytesIO
+from ..exceptions import NBTParseException
 import json
 
 
+def read_bytes(data: BytesIO, length: int) -> bytes:
+    """
+    reads exactly the specified amount of bytes from a stream
+    :param data: the byte stream to read from
+    :param length: the amount of bytes to read
+    :return: the read bytes
+    """
+    if length < 0:
+        raise NBTParseException(f"invalid length {length} in NBT data")
+    out = data.read(length)
+    if len(out) != length:
+        raise NBTParseException("unexpected end of NBT data")
+    return out
+
+
+# tag id -> NBT Component class, filled by NBTBase#get_type
+_TYPES: Dict[int, Type[NBTBase]] = {}
+
+
 class NBTBase:
     """
     Interface for all NBT Components
@@ -13,6 +33,7 @@ class NBTBase:
     Documentation:
       - https://minecraft.fandom.com/wiki/NBT_format
     """
+    __slots__ = ()
     DATATYPE_ID = -1
 
     @staticmethod
@@ -24,6 +45,14 @@ class NBTBase:
         """
         pass
 
+    @staticmethod
+    def skip(data: BytesIO) -> None:
+        """
+        Advances the passed stream past the current NBT Component Type without creating it
+        :param data: the byte stream to read from
+        """
+        pass
+
     def pack(self) -> bytes:
         """
         Packs the current Component to binary data
@@ -32,16 +61,17 @@ class NBTBase:
         return b'\x00'
 
     @staticmethod
-    def get_type(i: int) -> Optional[Type[NBTBase]]:
+    def get_type(i: int) -> Type[NBTBase]:
         """
         Searches for a NBT type with the specified ID
         :param i: the id to find the Type for
-        :return: the NBT Component class if one could be found, else None
+        :return: the NBT Component class
         """
-        for t in NBTBase.__subclasses__():
-            if t.DATATYPE_ID == i:
-                return t
-        return None
+        if not _TYPES:
+            _TYPES.update((t.DATATYPE_ID, t) for t in NBTBase.__subclasses__())
+        if i not in _TYPES:
+            raise NBTParseException(f"unknown NBT type {i}")
+        return _TYPES[i]
 
 
 class End(NBTBase):
@@ -49,125 +79,221 @@ class End(NBTBase):
     Type used for indicating the End of a NBT Compound
     Is sometimes used to fill Empty Lists
     """
+    __slots__ = ()
     DATATYPE_ID = 0
 
     @staticmethod
     def unpack(data: BytesIO) -> NBTBase:
         return End()
 
+    @staticmethod
+    def skip(data: BytesIO) -> None:
+        pass
+
 
 class Byte(NBTBase, int):
     """
     Represents a single Byte
     """
+    __slots__ = ()
     DATATYPE_ID = 1
 
     @staticmethod
     def unpack(data: BytesIO) -> NBTBase:
-        return Byte(int.from_bytes(data.read(1), "big", signed=True))
+        return Byte(int.from_bytes(read_bytes(data, 1), "big", signed=True))
+
+    @staticmethod
+    def skip(data: BytesIO) -> None:
+        read_bytes(data, 1)
+
+    def pack(self) -> bytes:
+        return pack(">b", self)
 
 
 class Short(int, NBTBase):
     """
     Represents a Short (2 bytes, Signed)
     """
+    __slots__ = ()
     DATATYPE_ID = 2
 
     @staticmethod
     def unpack(data: BytesIO) -> NBTBase:
-        return Short(unpack(">h", data.read(2))[0])
+        return Short(unpack(">h", read_bytes(data, 2))[0])
+
+    @staticmethod
+    def skip(data: BytesIO) -> None:
+        read_bytes(data, 2)
+
+    def pack(self) -> bytes:
+        return pack(">h", self)
 
 
 class Int(int, NBTBase):
     """
     Represents an Integer (4 Bytes, Signed)
     """
+    __slots__ = ()
     DATATYPE_ID = 3
 
     @staticmethod
     def unpack(data: BytesIO) -> NBTBase:
-        return Int(unpack(">i", data.read(4))[0])
+        return Int(unpack(">i", read_bytes(data, 4))[0])
+
+    @staticmethod
+    def skip(data: BytesIO) -> None:
+        read_bytes(data, 4)
+
+    def pack(self) -> bytes:
+        return pack(">i", self)
 
 
 class Long(int, NBTBase):
     """
     Represents a Long (8 Bytes, Signed)
     """
+    __slots__ = ()
     DATATYPE_ID = 4
 
     @staticmethod
     def unpack(data: BytesIO) -> NBTBase:
-        return Long(unpack(">q", data.read(8))[0])
+        return Long(unpack(">q", read_bytes(data, 8))[0])
+
+    @staticmethod
+    def skip(data: BytesIO) -> None:
+        read_bytes(data, 8)
+
+    def pack(self) -> bytes:
+        return pack(">q", self)
 
 
 class Float(float, NBTBase):
     """
     Represents a 4 byte floating point number (IEEE 754-2008)
     """
+    __slots__ = ()
     DATATYPE_ID = 5
 
     @staticmethod
     def unpack(data: BytesIO) -> NBTBase:
-        return Float(unpack(">f", data.read(4))[0])
+        return Float(unpack(">f", read_bytes(data, 4))[0])
+
+    @staticmethod
+    def skip(data: BytesIO) -> None:
+        read_bytes(data, 4)
+
+    def pack(self) -> bytes:
+        return pack(">f", self)
 
 
 class Double(float, NBTBase):
     """
     Represents a 8 byte floating point number (IEEE 754-2008)
     """
+    __slots__ = ()
     DATATYPE_ID = 6
 
     @staticmethod
     def unpack(data: BytesIO) -> NBTBase:
-        return Double(unpack(">d", data.read(8))[0])
+        return Double(unpack(">d", read_bytes(data, 8))[0])
+
+    @staticmethod
+    def skip(data: BytesIO) -> None:
+        read_bytes(data, 8)
+
+    def pack(self) -> bytes:
+        return pack(">d", self)
 
 
 class ByteArray(list, NBTBase):
     """
     Represents an Array of Bytes
     """
+    __slots__ = ()
     DATATYPE_ID = 7
 
     @staticmethod
     def unpack(data: BytesIO) -> NBTBase:
         length = Int.unpack(data)
-        return ByteArray(bytearray(data.read(length)))
+        return ByteArray(bytearray(read_bytes(data, length)))
+
+    @staticmethod
+    def skip(data: BytesIO) -> None:
+        read_bytes(data, Int.unpack(data))
+
+    def pack(self) -> bytes:
+        return pack(">i", len(self)) + bytes(b & 0xff for b in self)
 
 
 class String(str, NBTBase):
     """
     Represents a simple UTF-8 String
     """
+    __slots__ = ()
     DATATYPE_ID = 8
 
     @staticmethod
     def unpack(data: BytesIO) -> NBTBase:
-        length = unpack(">h", data.read(2))[0]
-        return String(data.read(length).decode("utf-8"))
+        length = unpack(">H", read_bytes(data, 2))[0]
+        return String(read_bytes(data, length).decode("utf-8"))
+
+    @staticmethod
+    def skip(data: BytesIO) -> None:
+        read_bytes(data, unpack(">H", read_bytes(data, 2))[0])
+
+    def pack(self) -> bytes:
+        data = self.encode("utf-8")
+        return pack(">H", len(data)) + data
 
 
 class List(list, NBTBase):
     """
     Represents a List of other NBT Types
     """
+    __slots__ = ()
     DATATYPE_ID = 9
 
     @staticmethod
     def unpack(data: BytesIO) -> NBTBase:
         datatype = NBTBase.get_type(Byte.unpack(data))
-        if datatype is None:
-            return List([])
         length = Int.unpack(data)
         ls = []
         for i in range(length):
             ls.append(datatype.unpack(data))
         return List(ls)
 
+    @staticmethod
+    def unpack_keys(data: BytesIO, keys: Union[Iterable[str], Mapping[str, Any]]) -> NBTBase:
+        """
+        Unpacks a List, only the specified entries of Compound elements are unpacked
+        :param data: the byte stream to read from
+        :param keys: the keys to unpack, see Compound#unpack_keys
+        :return: the List
+        """
+        datatype = NBTBase.get_type(Byte.unpack(data))
+        length = Int.unpack(data)
+        if datatype is not Compound:
+            return List([datatype.unpack(data) for _ in range(length)])
+        return List([Compound.unpack_keys(data, keys, False) for _ in range(length)])
+
+    @staticmethod
+    def skip(data: BytesIO) -> None:
+        datatype = NBTBase.get_type(Byte.unpack(data))
+        length = Int.unpack(data)
+        for i in range(length):
+            datatype.skip(data)
+
+    def pack(self) -> bytes:
+        if not self:
+            return pack(">bi", End.DATATYPE_ID, 0)
+        return pack(">bi", self[0].DATATYPE_ID, len(self)) + b"".join(item.pack() for item in self)
+
 
 class Compound(dict, NBTBase):
     """
     Represents a mapping from String Keys to NBT Types
     """
+    __slots__ = ()
     DATATYPE_ID = 10
 
     @staticmethod
@@ -182,6 +308,57 @@ class Compound(dict, NBTBase):
             out[name] = item
         return Compound(out)
 
+    @staticmethod
+    def unpack_keys(data: BytesIO, keys: Union[Iterable[str], Mapping[str, Any]], stop: bool = True) -> Compound:
+        """
+        Unpacks only the specified entries of a Compound, all other entries are skipped
+        :param data: the byte stream to read from
+        :param keys: the names of the entries to unpack, or a mapping of names to the keys to unpack of the
+                     entry, e.g. {"Level": {"Sections": {"Y": None, "SkyLight": None}}}; None unpacks the whole entry
+        :param stop: whether to stop reading as soon as all keys are found,
+                     the stream is then not advanced past the Compound
+        :return: a Compound containing the found entries
+        """
+        keys = dict(keys) if isinstance(keys, Mapping) else dict.fromkeys(keys)
+        out = {}
+        while keys or not stop:
+            type_id = Byte.unpack(data)
+            if type_id == 0:
+                break
+            name = String.unpack(data)
+            datatype = NBTBase.get_type(type_id)
+            if name not in keys:
+                datatype.skip(data)
+                continue
+            sub_keys = keys.pop(name)
+            if sub_keys is not None and datatype is Compound:
+                out[name] = Compound.unpack_keys(data, sub_keys, False)
+            elif sub_keys is not None and datatype is List:
+                out[name] = List.unpack_keys(data, sub_keys)
+            else:
+                out[name] = datatype.unpack(data)
+        return Compound(out)
+
+    @staticmethod
+    def skip(data: BytesIO) -> None:
+        while True:
+            type_id = Byte.unpack(data)
+            if type_id == 0:
+                break
+            String.skip(data)
+            NBTBase.get_type(type_id).skip(data)
+
+    def pack(self) -> bytes:
+        out = []
+        for name, item in self.items():
+            if not isinstance(item, NBTBase):
+                raise TypeError(f"value of {name!r} is not a NBT Component: {item!r}")
+            out.append(pack(">b", item.DATATYPE_ID))
+            out.append(String(name).pack())
+            out.append(item.pack())
+        out.append(End().pack())
+        return b"".join(out)
+
     def json(self):
         return json.dumps(self, indent=4)
 
@@ -190,27 +367,37 @@ class IntArray(list, NBTBase):
     """
     Represents an Array of Integers
     """
+    __slots__ = ()
     DATATYPE_ID = 11
 
     @staticmethod
     def unpack(data: BytesIO) -> NBTBase:
         length = Int.unpack(data)
-        out = []
-        for i in range(length):
-            out.append(Int.unpack(data))
-        return IntArray(out)
+        return IntArray([Int(i) for i in unpack(f">{length}i", read_bytes(data, 4 * length))])
+
+    @staticmethod
+    def skip(data: BytesIO) -> None:
+        read_bytes(data, 4 * Int.unpack(data))
+
+    def pack(self) -> bytes:
+        return pack(f">i{len(self)}i", len(self), *self)
 
 
 class LongArray(list, NBTBase):
     """
     Represents an Array of Longs
     """
+    __slots__ = ()
     DATATYPE_ID = 12
 
     @staticmethod
     def unpack(data: BytesIO) -> NBTBase:
         length = Int.unpack(data)
-        out = []
-        for i in range(length):
-            out.append(Long.unpack(data))
-        return IntArray(out)
+        return LongArray([Long(i) for i in unpack(f">{length}q", read_bytes(data, 8 * length))])
+
+    @staticmethod
+    def skip(data: BytesIO) -> None:
+        read_bytes(data, 8 * Int.unpack(data))
+
+    def pack(self) -> bytes:
+        return pack(f">i{len(self)}q", len(self), *self)
@@ -1,3 +1,198 @@
+from __future__ import annotations
+
+import os
+import struct
+import zlib
+from os.path import join as joinpath
+from typing import Tuple, Dict, List, Optional, Iterable, Iterator, Callable, Set, Union
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from .exceptions import PlayerNotFoundException, NBTParseException, PlayerRestoreException
+from .nbt import NBTParser
+from .util import atomic_write
+from .world.world import World
+
+
+def _chunksize(tasks: int, workers: Optional[int]) -> int:
+    # a few batches per worker process keep the pickling overhead low and the load balanced
+    return max(1, tasks // ((workers or os.cpu_count() or 1) * 4))
+
+
+class PlayerSummary:
+    """
+    cheap summary of a playerdata file, only the needed entries are parsed
+    """
+    KEYS = ("Pos", "Dimension")
+
+    def __init__(self, uuid: str, path: str, last_modified: float):
+        self.uuid: str = uuid
+        self.path: str = path
+        self.last_modified: float = last_modified
+
+        data = NBTParser.parse(path, keys=PlayerSummary.KEYS)
+        self.position: Optional[Tuple[float, float, float]] = tuple(data["Pos"]) if "Pos" in data else None
+        # String since 1.16, Int before
+        self.dimension: Optional[Union[str, int]] = data.get("Dimension")
+
+    def __repr__(self):
+        return f"PlayerSummary({self.uuid}, position={self.position}, dimension={self.dimension})"
+
+
+class PlayerIndex:
+    """
+    index of all playerdata files of a world by uuid
+    the files are read in parallel worker processes, files that can't be read are collected in PlayerIndex#errors
+    on platforms that spawn worker processes the index has to be created in an `if __name__ == "__main__":` block
+    """
+    def __init__(self, world: World, workers: Optional[int] = None):
+        self.world: World = world
+        self.workers: Optional[int] = workers
+        self.players: Dict[str, PlayerSummary] = {}
+        self.errors: Dict[str, Exception] = {}
+        self.refresh()
+
+    @staticmethod
+    def _load(uuid: str, path: str, last_modified: float) -> Union[PlayerSummary, Exception]:
+        try:
+            return PlayerSummary(uuid, path, last_modified)
+        except (OSError, EOFError, ValueError, KeyError, zlib.error, struct.error, NBTParseException) as e:
+            return e
+
+    def refresh(self) -> None:
+        """
+        rereads the playerdata directory of the world
+        """
+        self.players.clear()
+        self.errors.clear()
+        directory = joinpath(self.world.path, "playerdata")
+        if not os.path.isdir(directory):
+            return
+        with os.scandir(directory) as it:
+            entries = [entry for entry in it if entry.name.endswith(".dat") and entry.is_file()]
+        if not entries:
+            return
+        uuids = [entry.name[:-4] for entry in entries]
+        paths = [entry.path for entry in entries]
+        mtimes = [entry.stat().st_mtime for entry in entries]
+        # the parsing runs in python, so processes are needed to use multiple cores
+        with ProcessPoolExecutor(self.workers) as executor:
+            results = executor.map(PlayerIndex._load, uuids, paths, mtimes, chunksize=_chunksize(len(entries), self.workers))
+            for uuid, result in zip(uuids, results):
+                if isinstance(result, Exception):
+                    self.errors[uuid] = result
+                else:
+                    self.players[uuid] = result
+
+    def select(self, predicate: Callable[[PlayerSummary], bool]) -> List[PlayerSummary]:
+        """
+        :param predicate: function that decides whether a player is selected
+        :return: all players the predicate returned True for
+        """
+        return [player for player in self.players.values() if predicate(player)]
+
+    def __getitem__(self, uuid: str) -> PlayerSummary:
+        return self.players[uuid]
+
+    def __contains__(self, uuid: str) -> bool:
+        return uuid in self.players
+
+    def __iter__(self) -> Iterator[PlayerSummary]:
+        return iter(self.players.values())
+
+    def __len__(self) -> int:
+        return len(self.players)
+
+
 class PlayerRestorer:
-    def __init__(self):
-        pass
+    """
+    class to transfer playerdata from one world to another
+    either whole playerdata files or only selected fields are restored
+    on platforms that spawn worker processes PlayerRestorer#perform has to be called in an `if __name__ == "__main__":` block
+    """
+    INVENTORY = ("Inventory", "SelectedItemSlot")
+    ENDER_CHEST = ("EnderItems",)
+    POSITION = ("Pos", "Rotation", "Dimension")
+
+    def __init__(self, target_world: str, backup_world: str, workers: Optional[int] = None):
+        self.target_world: World = World(target_world)
+        self.backup_world: World = World(backup_world)
+        self.workers: Optional[int] = workers
+        self.actions: Dict[str, Optional[Set[str]]] = {}
+        self.restored: List[str] = []
+        self.errors: Dict[str, Exception] = {}
+
+    def add_player(self, uuid: str, fields: Optional[Iterable[str]] = None) -> None:
+        """
+        adds a player for transmission
+        :param uuid: the uuid of the player
+        :param fields: the entries to restore, e.g. PlayerRestorer.INVENTORY + PlayerRestorer.POSITION; None restores the whole file
+        """
+        if fields is None or (uuid in self.actions and self.actions[uuid] is None):
+            self.actions[uuid] = None
+        else:
+            self.actions.setdefault(uuid, set()).update(fields)
+
+    def add_players(self, uuids: Iterable[str], fields: Optional[Iterable[str]] = None) -> None:
+        """
+        adds multiple players for transmission
+        :param uuids: the uuids of the players
+        :param fields: the entries to restore, see PlayerRestorer#add_player
+        """
+        fields = None if fields is None else tuple(fields)
+        for uuid in uuids:
+            self.add_player(uuid, fields)
+
+    @staticmethod
+    def _restore(target_world: World, backup_world: World, uuid: str, fields: Optional[Set[str]]) -> None:
+        backup_file = backup_world.get_player_file(uuid)
+        if backup_file is None:
+            raise PlayerNotFoundException(f"Player {uuid} is not present in world {backup_world.path}", uuid)
+        target_file = target_world.get_player_file(uuid)
+        if fields is None:
+            with open(backup_file, "rb") as f:
+                data = f.read()
+            if target_file is None:
+                os.makedirs(joinpath(target_world.path, "playerdata"), exist_ok=True)
+                target_file = joinpath(target_world.path, "playerdata", f"{uuid}.dat")
+        else:
+            if target_file is None:
+                raise PlayerNotFoundException(f"Player {uuid} is not present in world {target_world.path}", uuid)
+            backup = NBTParser.parse(backup_file, keys=fields)
+            target = NBTParser.parse(target_file)
+            for field in fields:
+                if field in backup:
+                    target[field] = backup[field]
+                else:
+                    target.pop(field, None)
+            data = NBTParser.pack(target)
+        atomic_write(target_file, data)
+
+    @staticmethod
+    def _try_restore(target_world: World, backup_world: World, uuid: str, fields: Optional[Set[str]]) -> Optional[Exception]:
+        try:
+            PlayerRestorer._restore(target_world, backup_world, uuid, fields)
+        except Exception as e:
+            return e
+        return None
+
+    def perform(self) -> None:
+        """
+        performs all set player restorations in parallel worker processes
+        the restored players are listed in PlayerRestorer#restored, failures are collected in PlayerRestorer#errors
+        and raised together as PlayerRestoreException after all other players have been restored
+        """
+        self.restored.clear()
+        self.errors.clear()
+        if not self.actions:
+            return
+        with ProcessPoolExecutor(self.workers) as executor:
+            results = executor.map(PlayerRestorer._try_restore, repeat(self.target_world), repeat(self.backup_world),
+                                   self.actions.keys(), self.actions.values(),
+                                   chunksize=_chunksize(len(self.actions), self.workers))
+            for uuid, error in zip(self.actions.keys(), results):
+                if error is None:
+                    self.restored.append(uuid)
+                else:
+                    self.errors[uuid] = error
+        if self.errors:
+            raise PlayerRestoreException(list(self.restored), dict(self.errors))
@@ -1,2 +1,45 @@
+import os
+import stat
+import tempfile
+
+
 def ceil(k, b):
     return b - k % b + k
+
+
+def atomic_write(path: str, data: bytes) -> None:
+    """
+    writes data to a file without leaving a partially written file behind
+    the data is written to a temporary file in the same directory which then replaces the target
+    :param path: the file to write
+    :param data: the data to write
+    """
+    directory, name = os.path.split(os.path.abspath(path))
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        st = None
+    if st is None:
+        # new files get the default permissions, the umask is applied by the os
+        tmp = os.path.join(directory, f"{name}{os.urandom(8).hex()}.tmp")
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0), 0o666)
+    else:
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        if st is not None:
+            # mkstemp creates the file with mode 0600, keep the permissions of the replaced file instead
+            os.chmod(tmp, stat.S_IMODE(st.st_mode))
+            if hasattr(os, "chown"):
+                try:
+                    os.chown(tmp, st.st_uid, st.st_gid)
+                except OSError:
+                    # only possible with the needed privileges
+                    pass
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
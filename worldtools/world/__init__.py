@@ -1,5 +1,8 @@
 from .world import World
 from .region import Region
 from .heightmap import HeightMap
+from .edit import EditSession
+from .biome import Biomes
+from .light import Light
 
 # TODO: add caching for regions, chunks and sections
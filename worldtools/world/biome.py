@@ -0,0 +1,50 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Sequence
+from ..exceptions import BiomesNotFoundException
+import numpy
+
+if TYPE_CHECKING:
+    from .chunk import Chunk
+
+
+class Biomes:
+    """
+    biome ids of a chunk
+    before 1.15 there is one id per block column (2D, indexed [z, x]),
+    since 1.15 there is one id per 4x4x4 cell (3D, indexed [y // 4, z // 4, x // 4])
+    """
+    def __init__(self, chunk: Chunk):
+        self.chunk: Chunk = chunk
+        raw = self.chunk.data["Level"].get("Biomes")
+        if not raw:
+            raise BiomesNotFoundException(chunk.chunk)
+        self.array: numpy.ndarray = Biomes.to_array(raw)
+
+    @property
+    def is_3d(self) -> bool:
+        return self.array.ndim == 3
+
+    @staticmethod
+    def to_array(biomes: Sequence[int]) -> numpy.ndarray:
+        """
+        converts the Biomes IntArray of a chunk to a numpy array
+        :param biomes: the 256 or 1024 biome ids
+        :return: int32 array of shape (16, 16) or (64, 4, 4)
+        """
+        array = numpy.asarray(biomes, dtype=numpy.int32)
+        if array.size == 256:
+            return array.reshape((16, 16))
+        if array.size == 1024:
+            return array.reshape((64, 4, 4))
+        raise ValueError("error reading Biomes")
+
+    def get_layer(self, y: int = 0) -> numpy.ndarray:
+        """
+        gets the biomes of a horizontal layer in block resolution
+        :param y: the block y coordinate, ignored for 2D biomes
+        :return: int32 array of shape (16, 16), indexed [z, x]
+        """
+        if not self.is_3d:
+            return self.array
+        layer = self.array[min(max(y // 4, 0), 63)]
+        return layer.repeat(4, axis=0).repeat(4, axis=1)
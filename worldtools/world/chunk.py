@@ -1,18 +1,25 @@
 from __future__ import annotations
 
-from typing import Tuple, TYPE_CHECKING, List
+from typing import Tuple, TYPE_CHECKING, List, Dict, Mapping, Union, Optional
 from ..exceptions import ChunkNotFoundException, SectionNotPresentException
 from ..nbt import NBTParser
+from ..nbt.types import Byte, String, Compound, LongArray
+from ..nbt.types import List as NBTList
 from io import BytesIO
 import zlib
 import gzip
 import numpy
 from .heightmap import HeightMap
+from .biome import Biomes
+from .light import Light
 
 if TYPE_CHECKING:
     from .region import Region
 
 
+AIR = Compound({"Name": String("minecraft:air")})
+
+
 class Chunk:
     @staticmethod
     def decompress(data: bytes, method: int):
@@ -22,9 +29,24 @@ class Chunk:
             data = zlib.decompress(data)
         return data
 
-    def __init__(self, chunk: Tuple[int, int], region: Region):
+    @staticmethod
+    def compress(data: bytes, method: int):
+        if method == 1:
+            data = gzip.compress(data)
+        elif method == 2:
+            data = zlib.compress(data)
+        return data
+
+    def __init__(self, chunk: Tuple[int, int], region: Region, keys: Optional[Mapping] = None):
+        """
+        :param chunk: the chunk coordinates
+        :param region: the region the chunk is in
+        :param keys: if specified, only these entries of the chunk data are parsed, see Compound#unpack_keys
+        """
         self.chunk: Tuple[int, int] = chunk
         self.region: Region = region
+        self.sections: Dict[int, ChunkSection] = {}
+        self.dirty: bool = False
 
         loc = region.get_chunk_location(chunk)
         if loc is None:
@@ -36,7 +58,12 @@ class Chunk:
         bytes_length = int.from_bytes(data.read(4), "big")
         compression_method = int.from_bytes(data.read(1), "big")
 
-        self.data = NBTParser.parse(Chunk.decompress(data.read(bytes_length), compression_method), False)
+        self.data = NBTParser.parse(Chunk.decompress(data.read(bytes_length), compression_method), False, keys,
+                                     compact=self.region.world.compact_nbt and keys is None)
+
+    @property
+    def padded_block_states(self) -> bool:
+        return self.data.get("DataVersion", 0) >= BlockStates.PADDED_DATA_VERSION
 
     def get_block(self, coords: Tuple[int, int, int]):
         return self.region.world.get_block(coords)
@@ -44,33 +71,246 @@ class Chunk:
     def get_heightmap(self, type_: str):
         return HeightMap(self, type_)
 
-    def get_section(self, y):
-        for sec in range(len(self.data["Level"]["Sections"])):
-            if self.data["Level"]["Sections"][sec]["Y"] == y:
-                return ChunkSection(self, sec)
-        raise SectionNotPresentException(f"Section y={y} is not present in chunk {self.chunk}", (self.chunk[0], y, self.chunk[1]))
+    def get_biomes(self) -> Biomes:
+        return Biomes(self)
+
+    def get_section_light(self, y: int, type_: str = Light.BLOCK) -> numpy.ndarray:
+        """
+        gets the light levels of a section
+        :param y: the section y coordinate
+        :param type_: Light.BLOCK or Light.SKY
+        :return: uint8 array of shape (16, 16, 16), indexed [y, z, x]
+        """
+        for section in self.data["Level"].get("Sections", ()):
+            if section["Y"] == y and section.get(type_):
+                return Light.nibbles_to_volume(section[type_])
+        raise SectionNotPresentException(f"{type_} of section y={y} is not present in chunk {self.chunk}", (self.chunk[0], y, self.chunk[1]))
+
+    def get_light_layer(self, y: int, type_: str = Light.BLOCK) -> numpy.ndarray:
+        """
+        gets the light levels of a horizontal layer, only this layer is unpacked
+        :param y: the block y coordinate
+        :param type_: Light.BLOCK or Light.SKY
+        :return: uint8 array of shape (16, 16), indexed [z, x]
+        """
+        for section in self.data["Level"].get("Sections", ()):
+            if section["Y"] == y // 16 and section.get(type_):
+                return Light.nibbles_to_layer(section[type_], y % 16)
+        raise SectionNotPresentException(f"{type_} of section y={y // 16} is not present in chunk {self.chunk}", (self.chunk[0], y // 16, self.chunk[1]))
+
+    def get_light(self, type_: str = Light.BLOCK) -> numpy.ndarray:
+        """
+        gets the light levels of the whole chunk, sections without light data are filled with Light#default
+        :param type_: Light.BLOCK or Light.SKY
+        :return: uint8 array of shape (256, 16, 16), indexed [y, z, x]
+        """
+        out = numpy.full((16, 16, 16, 16), Light.default(type_), dtype=numpy.uint8)
+        for section in self.data["Level"].get("Sections", ()):
+            if 0 <= section["Y"] < 16 and section.get(type_):
+                out[section["Y"]] = Light.nibbles_to_volume(section[type_])
+        return out.reshape((256, 16, 16))
+
+    def get_section(self, y, create: bool = False):
+        """
+        gets a section of this chunk, sections are cached so changes to them are kept until the chunk is encoded
+        :param y: the section y coordinate
+        :param create: whether to create the section filled with air if it is not present
+        :return: the ChunkSection
+        """
+        if y in self.sections:
+            return self.sections[y]
+        if create and not 0 <= y < 16:
+            raise ValueError(f"Section y={y} is outside of the world height")
+        sections = self.data["Level"].setdefault("Sections", NBTList([]))
+        for sec in range(len(sections)):
+            if sections[sec]["Y"] == y:
+                break
+        else:
+            if not create:
+                raise SectionNotPresentException(f"Section y={y} is not present in chunk {self.chunk}", (self.chunk[0], y, self.chunk[1]))
+            sections.append(Compound({"Y": Byte(y)}))
+            sec = len(sections) - 1
+        if create and "Palette" not in sections[sec].keys():
+            sections[sec]["Palette"] = NBTList([Compound(AIR)])
+            sections[sec]["BlockStates"] = LongArray([0] * 256)
+        self.sections[y] = ChunkSection(self, sec)
+        return self.sections[y]
+
+    def encode(self, compression_method: int = 2) -> bytes:
+        """
+        writes all changed sections back to the chunk data and packs it the way it is stored in region files
+        :param compression_method: the compression to use, 1 for gzip, 2 for zlib
+        :return: the raw chunk bytes
+        """
+        for section in self.sections.values():
+            if section.dirty:
+                section.write()
+        if self.dirty and "isLightOn" in self.data["Level"].keys():
+            # let the server recalculate the light of the changed blocks
+            self.data["Level"]["isLightOn"] = Byte(0)
+        if self.dirty and "Heightmaps" in self.data["Level"].keys():
+            # missing heightmaps are regenerated by the server when the chunk is loaded
+            self.data["Level"]["Heightmaps"] = Compound({})
+        data = Chunk.compress(NBTParser.pack(self.data, False), compression_method)
+        return (len(data) + 1).to_bytes(4, "big") + compression_method.to_bytes(1, "big") + data
+
+    def mark_clean(self) -> None:
+        """
+        resets the dirty state of this chunk and its sections, called after the chunk has been written
+        """
+        self.dirty = False
+        for section in self.sections.values():
+            section.dirty = False
+
 
 class ChunkSection:
     def __init__(self, chunk: Chunk, index: int):
         self.chunk: Chunk = chunk
         self.index: int = index
+        self.dirty: bool = False
         if "Palette" not in self.chunk.data["Level"]["Sections"][index].keys():
             raise SectionNotPresentException(f"Section y={index} is not present in chunk {self.chunk.chunk}", (self.chunk.chunk[0], index, self.chunk.chunk[1]))
         self.palette = self.chunk.data["Level"]["Sections"][index]["Palette"]
-        self.block_states: BlockStates = BlockStates(self.chunk.data["Level"]["Sections"][index]["BlockStates"])
+        self.block_states: BlockStates = BlockStates(self.chunk.data["Level"]["Sections"][index]["BlockStates"],
+                                                     len(self.palette), self.chunk.padded_block_states)
+
+    @staticmethod
+    def to_block_state(block: Union[str, Mapping]) -> Compound:
+        """
+        converts a block name or a mapping with a name and optional properties to a palette entry
+        :param block: e.g. "minecraft:stone" or {"Name": "minecraft:oak_log", "Properties": {"axis": "y"}}
+        :return: the palette entry Compound
+        """
+        if isinstance(block, str):
+            return Compound({"Name": String(block)})
+        state = Compound({"Name": String(block["Name"])})
+        if block.get("Properties"):
+            state["Properties"] = Compound({String(k): String(v) for k, v in block["Properties"].items()})
+        return state
 
     def get_block(self, position: Tuple[int, int, int]):
         return self.palette[self.block_states.get_palette_index_for_block(position)]
 
+    def get_palette_index(self, block: Compound) -> int:
+        """
+        gets the index of a block state in the palette of this section, adds it if it is not present
+        :param block: the palette entry
+        :return: the palette index
+        """
+        for i, entry in enumerate(self.palette):
+            if entry == block:
+                return i
+        self.palette.append(block)
+        return len(self.palette) - 1
+
+    def set_block(self, position: Tuple[int, int, int], block: Union[str, Mapping]) -> None:
+        """
+        sets a block in this section
+        :param position: the position relative to the section
+        :param block: the block to set
+        """
+        index = self.get_palette_index(ChunkSection.to_block_state(block))
+        self.block_states.set_palette_index_for_block(position, index)
+        self.mark_dirty()
+
+    def fill(self, start: Tuple[int, int, int], end: Tuple[int, int, int], block: Union[str, Mapping]) -> None:
+        """
+        sets all blocks in a box in this section
+        :param start: the lowest corner relative to the section
+        :param end: the highest corner relative to the section, inclusive
+        :param block: the block to set
+        """
+        index = self.get_palette_index(ChunkSection.to_block_state(block))
+        self.block_states.fill(start, end, index)
+        self.mark_dirty()
+
+    def mark_dirty(self) -> None:
+        self.dirty = True
+        self.chunk.dirty = True
+
+    def write(self) -> None:
+        """
+        writes the palette and block states back to the chunk data, unused palette entries are removed
+        """
+        used, states = numpy.unique(self.block_states.states, return_inverse=True)
+        self.palette[:] = [self.palette[i] for i in used.tolist()]
+        self.block_states.states = states.reshape(-1).astype(numpy.uint16)
+        self.chunk.data["Level"]["Sections"][self.index]["BlockStates"] = LongArray(
+            BlockStates.palette_indices_to_longarray(self.block_states.states, len(self.palette),
+                                                     self.chunk.padded_block_states))
+
 
 class BlockStates:
-    def __init__(self, state):
-        self.states = BlockStates.longarray_to_palette_indices(state)
+    # since 20w17a values don't span over multiple longs, the remaining bits of each long are padding
+    PADDED_DATA_VERSION = 2529
+
+    def __init__(self, state, palette_size: int = 0, padded: bool = False):
+        if padded:
+            self.states = BlockStates.padded_longarray_to_palette_indices(state, palette_size)
+        else:
+            self.states = BlockStates.longarray_to_palette_indices(state)
 
     def get_palette_index_for_block(self, position: Tuple[int, int, int]):
         position = position[1] * 256 + position[2] * 16 + position[0]
         return self.states[position]
 
+    def set_palette_index_for_block(self, position: Tuple[int, int, int], index: int) -> None:
+        self.states[position[1] * 256 + position[2] * 16 + position[0]] = index
+
+    def fill(self, start: Tuple[int, int, int], end: Tuple[int, int, int], index: int) -> None:
+        """
+        sets the palette index of all blocks in a box
+        :param start: the lowest corner
+        :param end: the highest corner, inclusive
+        :param index: the palette index to set
+        """
+        self.states.reshape((16, 16, 16))[start[1]:end[1] + 1, start[2]:end[2] + 1, start[0]:end[0] + 1] = index
+
+    @staticmethod
+    def get_bits_per_value(palette_size: int) -> int:
+        return max(4, (palette_size - 1).bit_length())
+
+    @staticmethod
+    def palette_indices_to_longarray(indices: numpy.ndarray, palette_size: int, padded: bool = False) -> List[int]:
+        """
+        converts palette indices to packed longs
+        :param indices: the 4096 palette indices
+        :param palette_size: the length of the palette, determines the bits per value
+        :param padded: whether to use the padded format of DataVersion >= BlockStates.PADDED_DATA_VERSION
+        :return: list of signed longs
+        """
+        bits_per_value = BlockStates.get_bits_per_value(palette_size)
+        if bits_per_value > 12:
+            raise ValueError("error writing BlockStates")
+        if padded:
+            values_per_long = 64 // bits_per_value
+            longs = -(-4096 // values_per_long)
+            values = numpy.zeros((longs * values_per_long,), dtype=numpy.uint64)
+            values[:4096] = indices
+            shifts = numpy.arange(values_per_long, dtype=numpy.uint64) * numpy.uint64(bits_per_value)
+            packed = numpy.bitwise_or.reduce(values.reshape((longs, values_per_long)) << shifts, axis=1)
+            return packed.view(numpy.int64).tolist()
+        bits = (indices.astype(numpy.uint16)[:, None] >> numpy.arange(bits_per_value, dtype=numpy.uint16)) & 1
+        packed = numpy.packbits(bits.astype(numpy.uint8).reshape(-1), bitorder="little")
+        return packed.view("<i8").tolist()
+
+    @staticmethod
+    def padded_longarray_to_palette_indices(long_array: List[int], palette_size: int) -> numpy.ndarray:
+        """
+        converts the padded longs of DataVersion >= BlockStates.PADDED_DATA_VERSION to palette indices
+        :param long_array: the longs array to convert
+        :param palette_size: the length of the palette, determines the bits per value
+        :return: numpy array of BlockStates
+        """
+        bits_per_value = BlockStates.get_bits_per_value(palette_size)
+        values_per_long = 64 // bits_per_value
+        if bits_per_value > 12 or len(long_array) != -(-4096 // values_per_long):
+            raise ValueError("error reading BlockStates")
+        longs = numpy.asarray(long_array, dtype=numpy.int64).view(numpy.uint64)
+        shifts = numpy.arange(values_per_long, dtype=numpy.uint64) * numpy.uint64(bits_per_value)
+        values = (longs[:, None] >> shifts) & numpy.uint64((1 << bits_per_value) - 1)
+        return values.reshape(-1)[:4096].astype(numpy.uint16)
+
     @staticmethod
     def longarray_to_palette_indices(long_array: List[int]) -> numpy.ndarray:
         """
@@ -81,10 +321,12 @@ class BlockStates:
         :param long_array: the longs array to convert
         :return: numpy array of BlockStates
         """
-        bits_per_value = (len(long_array) * 64) / 4096
+        if len(long_array) * 64 % 4096:
+            raise ValueError("error reading BlockStates")
+        bits_per_value = (len(long_array) * 64) // 4096
         if bits_per_value < 4 or 12 < bits_per_value:
             raise ValueError("error reading BlockStates")
-        b = numpy.frombuffer(numpy.asarray(long_array, dtype=numpy.uint64), dtype=numpy.uint8)
+        b = numpy.frombuffer(numpy.asarray(long_array, dtype=numpy.int64), dtype=numpy.uint8)
 
         b = b.astype(numpy.uint16)
         if bits_per_value == 8:
@@ -139,7 +381,7 @@ class BlockStates:
             result[3::8] = ((b[5::11] & 0x0f) << 7) | ((b[4::11] & 0xfe) >> 1)
             result[4::8] = ((b[6::11] & 0x7f) << 4) | ((b[5::11] & 0xf0) >> 4)
             result[5::8] = ((b[8::11] & 0x03) << 9) | (b[7::11] << 1) | ((b[6::11] & 0x80) >> 7)
-            result[6::8] = ((b[9::11] & 0x1f) << 2) | ((b[8::11] & 0xfc) >> 2)
+            result[6::8] = ((b[9::11] & 0x1f) << 6) | ((b[8::11] & 0xfc) >> 2)
             result[7::8] = (b[10::11] << 3) | ((b[9::11] & 0xe0) >> 5)
         elif bits_per_value == 12:
             result[0::2] = ((b[1::3] & 0x0f) << 8) | b[0::3]
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+from typing import Tuple, Dict, List, Optional, Union, Mapping, TYPE_CHECKING
+from concurrent.futures import ThreadPoolExecutor
+from ..exceptions import SectionNotPresentException, ChunkNotFoundException
+from ..nbt.types import Compound
+from .chunk import Chunk, ChunkSection, AIR
+
+if TYPE_CHECKING:
+    from .world import World
+
+
+class EditSession:
+    """
+    collects block changes on cached chunks of a world and writes them in one go
+    only changed chunks are encoded when committing, every region file is written once.
+    can be used as context manager, changes are committed when the block exits without an exception
+    """
+    def __init__(self, world: World, workers: Optional[int] = None):
+        self.world: World = world
+        self.workers: Optional[int] = workers
+        self.chunks: Dict[Tuple[int, int], Chunk] = {}
+
+    def __enter__(self) -> EditSession:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        if exc_type is None:
+            self.commit()
+
+    def get_chunk(self, chunk: Tuple[int, int]) -> Chunk:
+        """
+        gets a chunk that is cached for the duration of this session
+        :param chunk: the chunk coordinates
+        :return: the cached Chunk
+        """
+        if chunk not in self.chunks:
+            self.chunks[chunk] = self.world.get_chunk(chunk)
+        return self.chunks[chunk]
+
+    def get_block(self, position: Tuple[int, int, int]) -> Compound:
+        """
+        gets a block including the changes made in this session
+        :param position: the block position
+        :return: the palette entry of the block
+        """
+        section = self.get_chunk((position[0] // 16, position[2] // 16)).get_section(position[1] // 16)
+        return section.get_block((position[0] % 16, position[1] % 16, position[2] % 16))
+
+    def set_block(self, position: Tuple[int, int, int], block: Union[str, Mapping]) -> None:
+        """
+        sets a block, missing sections are created
+        :param position: the block position
+        :param block: the block name or a mapping with name and properties, see ChunkSection#to_block_state
+        """
+        self.fill((position, position), block, skip_missing=False)
+
+    def fill(self, bbox: Tuple[Tuple[int, int, int], Tuple[int, int, int]], block: Union[str, Mapping],
+             skip_missing: bool = True) -> None:
+        """
+        sets all blocks in a box, missing sections are created unless the box is filled with air
+        :param bbox: two opposite corners of the box, both inclusive
+        :param block: the block name or a mapping with name and properties, see ChunkSection#to_block_state
+        :param skip_missing: whether to skip chunks that are not generated instead of raising ChunkNotFoundException
+        """
+        start = tuple(min(a, b) for a, b in zip(*bbox))
+        end = tuple(max(a, b) for a, b in zip(*bbox))
+        create = ChunkSection.to_block_state(block) != AIR
+        for chunk_x in range(start[0] // 16, end[0] // 16 + 1):
+            for chunk_z in range(start[2] // 16, end[2] // 16 + 1):
+                try:
+                    chunk = self.get_chunk((chunk_x, chunk_z))
+                except (ChunkNotFoundException, FileNotFoundError):
+                    # FileNotFoundError is raised when the whole region is missing
+                    if skip_missing:
+                        continue
+                    raise
+                for section_y in range(start[1] // 16, end[1] // 16 + 1):
+                    try:
+                        section = chunk.get_section(section_y, create=create)
+                    except SectionNotPresentException:
+                        # sections that are not present only contain air
+                        continue
+                    origin = (chunk_x * 16, section_y * 16, chunk_z * 16)
+                    section.fill(tuple(max(s - o, 0) for s, o in zip(start, origin)),
+                                 tuple(min(e - o, 15) for e, o in zip(end, origin)),
+                                 block)
+
+    def get_dirty_chunks(self) -> List[Chunk]:
+        """
+        :return: all chunks that were changed in this session and are not written yet
+        """
+        return [chunk for chunk in self.chunks.values() if chunk.dirty]
+
+    def commit(self) -> None:
+        """
+        encodes all changed chunks in parallel and writes them to their region files
+        """
+        dirty = self.get_dirty_chunks()
+        if not dirty:
+            return
+        # zlib releases the GIL, so the compression runs in parallel
+        with ThreadPoolExecutor(self.workers) as executor:
+            encoded = list(executor.map(Chunk.encode, dirty))
+        regions: Dict[Tuple[int, int], Dict[Tuple[int, int], bytes]] = {}
+        for chunk, data in zip(dirty, encoded):
+            regions.setdefault(self.world.get_region_coordinates(chunk.chunk), {})[chunk.chunk] = data
+        for chunks in regions.values():
+            region = self.world.get_region(next(iter(chunks)))
+            region.set_chunks(chunks)
+            region.flush()
+        for chunk in dirty:
+            chunk.mark_clean()
+
+    def discard(self) -> None:
+        """
+        drops all cached chunks and their changes
+        """
+        self.chunks.clear()
@@ -0,0 +1,50 @@
+from __future__ import annotations
+from typing import Sequence
+import numpy
+
+
+class Light:
+    """
+    light levels are stored per section as 2048 bytes with one 4 bit value per block
+    """
+    BLOCK = "BlockLight"
+    SKY = "SkyLight"
+
+    @staticmethod
+    def default(type_: str) -> int:
+        """
+        :param type_: Light.BLOCK or Light.SKY
+        :return: the light level of blocks in sections without light data
+        """
+        return 15 if type_ == Light.SKY else 0
+
+    @staticmethod
+    def nibbles_to_volume(nibbles: Sequence[int]) -> numpy.ndarray:
+        """
+        unpacks a BlockLight or SkyLight array
+        :param nibbles: the 2048 packed bytes
+        :return: uint8 array of shape (16, 16, 16), indexed [y, z, x]
+        """
+        packed = numpy.asarray(nibbles).astype(numpy.uint8)
+        if packed.size != 2048:
+            raise ValueError("error reading light")
+        out = numpy.empty((4096,), dtype=numpy.uint8)
+        out[0::2] = packed & 0x0f
+        out[1::2] = packed >> 4
+        return out.reshape((16, 16, 16))
+
+    @staticmethod
+    def nibbles_to_layer(nibbles: Sequence[int], y: int) -> numpy.ndarray:
+        """
+        unpacks a single horizontal layer of a BlockLight or SkyLight array
+        :param nibbles: the 2048 packed bytes
+        :param y: the block y coordinate relative to the section
+        :return: uint8 array of shape (16, 16), indexed [z, x]
+        """
+        packed = numpy.asarray(nibbles[y * 128:(y + 1) * 128]).astype(numpy.uint8)
+        if len(nibbles) != 2048:
+            raise ValueError("error reading light")
+        out = numpy.empty((256,), dtype=numpy.uint8)
+        out[0::2] = packed & 0x0f
+        out[1::2] = packed >> 4
+        return out.reshape((16, 16))
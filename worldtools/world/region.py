@@ -2,9 +2,11 @@ from __future__ import annotations
 
 import struct
 import time
-from typing import Tuple, Optional, TYPE_CHECKING
-from ..exceptions import ChunkNotFoundException
+from typing import Tuple, Optional, TYPE_CHECKING, Dict, List, Iterator, Iterable, Mapping
+from ..exceptions import ChunkNotFoundException, BiomesNotFoundException, SectionNotPresentException
 from .chunk import Chunk
+from .light import Light
+import numpy
 
 if TYPE_CHECKING:
     from .world import World
@@ -15,6 +17,10 @@ class Region:
     represents a minecraft region file of a minecraft world
     https://minecraft.fandom.com/wiki/Region_file_format
     """
+    # chunk entries needed for the rasters, see Region#get_chunks
+    BIOME_KEYS = {"Level": {"Biomes": None}}
+    LIGHT_KEYS = {"Level": {"Sections": {"Y": None, Light.BLOCK: None, Light.SKY: None}}}
+
     def __init__(self, region: Tuple[int, int], world: World):
         self.region: Tuple[int, int] = region
         self.world: World = world
@@ -71,18 +77,43 @@ class Region:
         :param chunk: the chunk coordinates to modify
         :param data: the new chunk data
         """
-        loc = self.get_chunk_location(chunk)
-        if loc is None:
+        if self.get_chunk_location(chunk) is None:
             raise ChunkNotFoundException(f"Chunk {chunk} is not present in Region File {self.world.get_region_file(self.region)}", chunk)
-        offset, _ = loc
-        # set timestamp
-        t_off = Region.get_offset_offset(chunk) + 4096
-        self.data = self.data[:t_off] + struct.pack(">I", int(time.time())) + self.data[t_off + 4:]
-        # set chunk data
-        self.data = self.data[:offset] + data + self.data[offset + len(data):]
-        # set sector length
-        sector_count = int(1 + ((len(data) - 1) / 4096)).to_bytes(1, "big", signed=False)
-        self.data = self.data[:Region.get_offset_offset(chunk) + 3] + sector_count + self.data[Region.get_offset_offset(chunk) + 4:]
+        self.set_chunks({chunk: data})
+
+    def set_chunks(self, chunks: Dict[Tuple[int, int], bytes]) -> None:
+        """
+        sets multiple chunks in the region file at once
+        the region data is rebuilt in a single pass, so chunks can grow beyond their old sector count.
+        changes don't get written until Region#flush is called.
+        :param chunks: mapping of chunk coordinates to raw chunk data, as returned by Region#get_raw_chunk or Chunk#encode
+        """
+        chunks = {(chunk[0] & 31, chunk[1] & 31): data for chunk, data in chunks.items()}
+        timestamp = struct.pack(">I", int(time.time()))
+        locations = bytearray(4096)
+        timestamps = bytearray(self.data[4096:8192])
+        sectors: List[bytes] = []
+        sector_offset = 2
+        for i in range(1024):
+            chunk = (i % 32, i // 32)
+            if chunk in chunks:
+                data = chunks[chunk]
+                timestamps[4 * i:4 * i + 4] = timestamp
+            else:
+                loc = self.get_chunk_location(chunk)
+                if loc is None:
+                    continue
+                offset, sector_length = loc
+                data = self.data[offset:offset + sector_length]
+            # strip the padding of the old sectors
+            data = data[:int.from_bytes(data[:4], "big") + 4]
+            sector_count = (len(data) + 4095) // 4096
+            if sector_count > 255:
+                raise ValueError(f"Chunk {chunk} of region {self.region} is too large to be stored in the region file")
+            locations[4 * i:4 * i + 4] = sector_offset.to_bytes(3, "big") + sector_count.to_bytes(1, "big")
+            sectors.append(data + bytes(sector_count * 4096 - len(data)))
+            sector_offset += sector_count
+        self.data = bytes(locations) + bytes(timestamps) + b"".join(sectors)
 
     def get_chunk(self, chunk: Tuple[int, int]) -> Chunk:
         """
@@ -92,6 +123,54 @@ class Region:
         """
         return Chunk(chunk, self)
 
+    def get_chunks(self, keys: Optional[Mapping] = None) -> Iterator[Chunk]:
+        """
+        parses all chunks present in the region file
+        :param keys: if specified, only these entries of the chunk data are parsed, see Compound#unpack_keys
+        :return: iterator of the Chunks
+        """
+        for i in range(1024):
+            chunk = (self.region[0] * 32 + i % 32, self.region[1] * 32 + i // 32)
+            if self.get_chunk_location(chunk) is not None:
+                yield Chunk(chunk, self, keys)
+
+    def get_biome_raster(self, y: int = 0, chunks: Optional[Iterable[Chunk]] = None) -> numpy.ndarray:
+        """
+        gets the biomes of a horizontal layer of the whole region in block resolution
+        :param y: the block y coordinate, ignored for worlds with 2D biomes
+        :param chunks: already parsed chunks of this region, e.g. from get_chunks(Region.BIOME_KEYS) to render
+                       multiple layers, by default only the biomes of the chunks are parsed
+        :return: int32 array of shape (512, 512), indexed [z, x], -1 where no chunk is present
+        """
+        out = numpy.full((512, 512), -1, dtype=numpy.int32)
+        for chunk in chunks if chunks is not None else self.get_chunks(Region.BIOME_KEYS):
+            try:
+                layer = chunk.get_biomes().get_layer(y)
+            except BiomesNotFoundException:
+                continue
+            x, z = (chunk.chunk[0] & 31) * 16, (chunk.chunk[1] & 31) * 16
+            out[z:z + 16, x:x + 16] = layer
+        return out
+
+    def get_light_raster(self, y: int, type_: str = Light.BLOCK, chunks: Optional[Iterable[Chunk]] = None) -> numpy.ndarray:
+        """
+        gets the light levels of a horizontal layer of the whole region
+        :param y: the block y coordinate
+        :param type_: Light.BLOCK or Light.SKY
+        :param chunks: already parsed chunks of this region, e.g. from get_chunks(Region.LIGHT_KEYS) to render
+                       multiple layers, by default only the light data of the chunks is parsed
+        :return: uint8 array of shape (512, 512), indexed [z, x], Light#default where no data is present
+        """
+        out = numpy.full((512, 512), Light.default(type_), dtype=numpy.uint8)
+        for chunk in chunks if chunks is not None else self.get_chunks(Region.LIGHT_KEYS):
+            try:
+                layer = chunk.get_light_layer(y, type_)
+            except SectionNotPresentException:
+                continue
+            x, z = (chunk.chunk[0] & 31) * 16, (chunk.chunk[1] & 31) * 16
+            out[z:z + 16, x:x + 16] = layer
+        return out
+
     def flush(self) -> None:
         """
         writes all changes to the region file
@@ -5,6 +5,7 @@ from os.path import join as joinpath
 from os.path import isfile
 from .region import Region
 from .chunk import Chunk, ChunkSection
+from .edit import EditSession
 from ..nbt.types import Compound
 
 
@@ -12,9 +13,10 @@ class World:
     """
     represents a minecraft world or a backed up world
     """
-    def __init__(self, path: str, enable_caching: bool = True):
+    def __init__(self, path: str, enable_caching: bool = True, compact_nbt: bool = False):
         self.path: str = path
         self.caching: bool = enable_caching
+        self.compact_nbt: bool = compact_nbt
         if self.caching:
             self.region_cache = {}
 
@@ -48,6 +50,14 @@ class World:
     def get_chunk_section(self, section: Tuple[int, int, int]) -> ChunkSection:
         return self.get_chunk((section[0], section[2])).get_section(section[1])
 
+    def edit(self, workers: Optional[int] = None) -> EditSession:
+        """
+        starts a session for changing blocks of this world
+        :param workers: the number of threads used for encoding the changed chunks
+        :return: the EditSession, use it as context manager or call EditSession#commit
+        """
+        return EditSession(self, workers)
+
     @staticmethod
     def get_region_coordinates(chunk: Tuple[int, int]) -> Tuple[int, int]:
         """
@@ -68,3 +78,14 @@ class World:
         if not isfile(p):
             return None
         return p
+
+    def get_player_file(self, uuid: str) -> Optional[str]:
+        """
+        gets the path to the playerdata file of a player
+        :param uuid: the uuid of the player
+        :return: the path of the playerdata file
+        """
+        p = joinpath(self.path, "playerdata", f"{uuid}.dat")
+        if not isfile(p):
+            return None
+        return p